@@ -1,2 +1,3 @@
 name = "cocapi"
+from cocapi.async_api import AsyncCocApi
 from cocapi.cocapi import CocApi
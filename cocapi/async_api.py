@@ -0,0 +1,708 @@
+import asyncio
+import threading
+import weakref
+from typing import Any, Awaitable, Dict, Hashable, List, Optional, Set, Tuple, Type
+from warnings import warn
+
+import httpx
+
+from cocapi.cocapi import (
+    _HTTP2_AVAILABLE,
+    _backoff_delay,
+    _CocApiEndpoints,
+    _error_response,
+    _handle_response,
+    _health_check_passed,
+    _needs_health_check,
+    _parse_json,
+    _rate_limited_response,
+    _request_error,
+    _request_key,
+    _should_retry,
+    _test_response,
+    _TokenBucket,
+    _TTLCache,
+)
+
+# Connection pools shared by AsyncCocApi instances on each event loop, keyed
+# by the client options, each entry holds the client and its user count. The
+# loop itself is the key, held weakly, as a new loop can reuse the id of one
+# that has finished.
+_LoopClients = Dict[Tuple, List[Any]]
+_SHARED_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopClients]"
+_SHARED_CLIENTS = weakref.WeakKeyDictionary()
+_SHARED_CLIENTS_LOCK = threading.Lock()
+
+
+def _new_async_client(
+    base_url: str,
+    timeout: int,
+    http2: bool,
+    max_connections: int,
+    max_keepalive_connections: int,
+    transport: Optional[httpx.AsyncBaseTransport],
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        transport=transport,
+    )
+
+
+def _acquire_shared_client(
+    options: Tuple,
+) -> Tuple["weakref.ref[asyncio.AbstractEventLoop]", httpx.AsyncClient]:
+    """
+    Function to Get the pool shared for these options on the running event
+    loop, a client is bound to the loop it was first used on
+    """
+    loop = asyncio.get_running_loop()
+    with _SHARED_CLIENTS_LOCK:
+        clients = _SHARED_CLIENTS.setdefault(loop, {})
+        entry = clients.get(options)
+        if entry is None or entry[0].is_closed:
+            entry = clients[options] = [_new_async_client(*options), 0]
+        entry[1] += 1
+        return weakref.ref(loop), entry[0]
+
+
+def _release_shared_client(
+    loop_ref: "weakref.ref[asyncio.AbstractEventLoop]", options: Tuple
+) -> Optional[httpx.AsyncClient]:
+    """
+    Function to give up one use of a shared pool, the client is returned for
+    closing once its last user is done with it
+    """
+    loop = loop_ref()
+    if loop is None:
+        return None
+    with _SHARED_CLIENTS_LOCK:
+        clients = _SHARED_CLIENTS.get(loop, {})
+        entry = clients.get(options)
+        if entry is None:
+            return None
+        entry[1] -= 1
+        if entry[1] > 0:
+            return None
+        del clients[options]
+        return entry[0]
+
+
+# Closes scheduled for abandoned pools, referenced until they are done
+_CLOSING_CLIENTS: Set["asyncio.Task[None]"] = set()
+
+
+def _abandon_shared_client(
+    loop_ref: "weakref.ref[asyncio.AbstractEventLoop]", options: Tuple
+) -> None:
+    """
+    Function to give up the use of a shared pool by an instance that was
+    garbage collected without being closed, the pool is closed on its loop
+    if that was its last user and the loop is still running
+    """
+    client = _release_shared_client(loop_ref, options)
+    loop = loop_ref()
+    if client is None or loop is None or not loop.is_running():
+        return
+    loop.call_soon_threadsafe(_close_shared_client, loop, client)
+
+
+def _close_shared_client(
+    loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient
+) -> None:
+    task = loop.create_task(client.aclose())
+    _CLOSING_CLIENTS.add(task)
+    task.add_done_callback(_CLOSING_CLIENTS.discard)
+
+
+class AsyncCocApi(_CocApiEndpoints):
+    """
+    Asynchronous version of CocApi, every endpoint method is a coroutine.
+    Use it as an async context manager so the token is checked on entry and
+    the connection pool is closed on exit.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 20,
+        status_code: bool = False,
+        http2: Optional[bool] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        max_concurrent_requests: int = 10,
+        enable_caching: bool = False,
+        cache_ttl: int = 300,
+        cache_max_entries: int = 1024,
+        dedicated_client: bool = False,
+        enable_rate_limiting: bool = False,
+        requests_per_second: float = 10.0,
+        burst_limit: int = 20,
+        max_rate_limit_wait: Optional[float] = None,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        health_check_ttl: float = 60.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        validate_token: bool = True,
+    ):
+        """
+        Initialising requisites, takes the options of CocApi along with
+        max_concurrent_requests for the bulk methods and dedicated_client
+        """
+        self.token = token
+        self.health_check_ttl = health_check_ttl
+        self.validate_token = validate_token
+        self.__remember_health_check = transport is None and client is None
+        self.ENDPOINT = "https://api.clashofclans.com/v1"
+        self.timeout = timeout
+        self.headers = {
+            "authorization": f"Bearer {token}",
+            "Accept": "application/json",
+        }
+        self.status_code = status_code
+        self.http2 = _HTTP2_AVAILABLE if http2 is None else http2
+        self.max_concurrent_requests = max_concurrent_requests
+        self.enable_rate_limiting = enable_rate_limiting
+        self.__rate_limiter = _TokenBucket(rate=requests_per_second, burst=burst_limit)
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.dedicated_client = dedicated_client
+        self.__client_options = (
+            self.ENDPOINT,
+            timeout,
+            self.http2,
+            max_connections,
+            max_keepalive_connections,
+            transport,
+        )
+        # Unless passed in, opened on first use so a shared pool binds to the
+        # running event loop
+        self._client: Optional[httpx.AsyncClient] = client
+        self.__owns_client = client is None
+        # Gives up the use of a shared pool when the instance is garbage
+        # collected without being closed
+        self.__finalizer: Optional[weakref.finalize] = None
+        self.__shared_loop: Optional["weakref.ref[asyncio.AbstractEventLoop]"] = None
+        self.enable_caching = enable_caching
+        self.__cache = _TTLCache(ttl=cache_ttl, max_entries=cache_max_entries)
+        self.__inflight: Dict[Tuple, "asyncio.Future[Dict]"] = {}
+        # Created on first use so it binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self) -> "AsyncCocApi":
+        remember = self.__remember_health_check
+        if self.validate_token and _needs_health_check(
+            self.token, self.ENDPOINT, self.health_check_ttl, remember
+        ):
+            try:
+                test_reponse = await self.test()
+                if test_reponse.get("result") == "error":
+                    raise Exception(test_reponse.get("message"))
+            except BaseException:
+                await self.close()
+                raise
+            _health_check_passed(self.token, self.ENDPOINT, remember)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Any,
+    ) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        Function to close the connection pool used by the client
+        """
+        if not self.__owns_client:
+            return
+        client, self._client = self._client, None
+        if client is None:
+            return
+        if self.__finalizer is not None and self.__shared_loop is not None:
+            self.__finalizer.detach()
+            self.__finalizer = None
+            # Only the last user of a shared pool gets it back to close
+            client = _release_shared_client(self.__shared_loop, self.__client_options)
+        if client is not None:
+            await client.aclose()
+
+    def __get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            if self.dedicated_client:
+                self._client = _new_async_client(*self.__client_options)
+            else:
+                self.__shared_loop, self._client = _acquire_shared_client(
+                    self.__client_options
+                )
+                self.__finalizer = weakref.finalize(
+                    self,
+                    _abandon_shared_client,
+                    self.__shared_loop,
+                    self.__client_options,
+                )
+        return self._client
+
+    def clear_cache(self) -> None:
+        """
+        Function to drop every cached response
+        """
+        self.__cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Function to Get the state of the response cache
+        """
+        return dict(self.__cache.stats(), cache_enabled=self.enable_caching)
+
+    async def _api_response(
+        self, uri: str, params: Optional[Dict] = None, status_code: bool = False
+    ) -> Dict:
+        """
+        Function to handle requests,it is possible to use this handler on it's
+        own to make request to the api on in case of a new or unsupported api
+        Args:
+            uri  -> The endpoint uri that needs to be called for the specific function
+            params   -> Dictionary of supported params to be filtered
+                        with Refer https://developer.clashofclans.com/#/documentation
+        Return:
+            The json response from the api as is or returns error if broken
+        """
+        key = _request_key(uri=uri, params=params, status_code=status_code)
+        if self.enable_caching:
+            cached = self.__cache.get(key)
+            if cached is not None:
+                return cached
+        # Identical requests issued concurrently await the one already in
+        # flight, shielded so a cancelled caller does not cancel it for others
+        inflight = self.__inflight.get(key)
+        if inflight is not None:
+            return dict(await asyncio.shield(inflight))
+        task = asyncio.ensure_future(
+            self.__request(uri=uri, params=params, status_code=status_code, key=key)
+        )
+        self.__inflight[key] = task
+        task.add_done_callback(lambda _: self.__inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def __request(
+        self, uri: str, params: Optional[Dict], status_code: bool, key: Hashable
+    ) -> Dict:
+        try:
+            response = await self.__send(uri=uri, params=params)
+            return _handle_response(
+                response,
+                status_code=status_code or self.status_code,
+                cache=self.__cache if self.enable_caching else None,
+                key=key,
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            return _request_error(e)
+
+    async def __send(self, uri: str, params: Optional[Dict]) -> httpx.Response:
+        """
+        Send the request, retrying timeouts, connection errors, 429 and 5xx
+        responses with exponential backoff
+        """
+        attempt = 0
+        while True:
+            if self.enable_rate_limiting:
+                delay = self.__rate_limiter.reserve(self.max_rate_limit_wait)
+                if delay is None:
+                    return _rate_limited_response()
+                if delay:
+                    await asyncio.sleep(delay)
+            response = None
+            try:
+                # Absolute url so that a client passed in works too
+                response = await self.__get_client().get(
+                    self.ENDPOINT + uri, params=params, headers=self.headers
+                )
+            except (httpx.TimeoutException, httpx.ConnectError):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if not _should_retry(response) or attempt >= self.max_retries:
+                    return response
+            await asyncio.sleep(
+                _backoff_delay(
+                    attempt, self.retry_delay, self.max_retry_delay, response
+                )
+            )
+            attempt += 1
+
+    async def __bounded(self, request: Awaitable[Dict]) -> Dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        async with self._semaphore:
+            return await request
+
+    async def __gather(self, requests: List[Awaitable[Dict]]) -> List[Dict]:
+        """
+        Run the requests concurrently, at most max_concurrent_requests at a
+        time, the order of the results matches the order of the requests
+        """
+        results = await asyncio.gather(
+            *[self.__bounded(request) for request in requests],
+            return_exceptions=True,
+        )
+        # One failed request should not lose the results of the others
+        return [
+            (
+                _error_response("Something broke, please try again!", result)
+                if isinstance(result, BaseException)
+                else result
+            )
+            for result in results
+        ]
+
+    async def test(self) -> Dict[str, Any]:
+        """
+        Function to test if the api is up and running.
+            Dictionary with a success if api is up error if false
+        """
+        response = await self.__get_client().get(self.ENDPOINT, headers=self.headers)
+        return _test_response(response.status_code, self.status_code)
+
+    async def clan_leaguegroup(self, tag: str) -> Dict:
+        """
+        Function to Retrieve information about clan's current clan war league group
+        """
+        return await self._api_response(
+            uri=self.CLAN_LEAGUEGROUP_URI.format(tag=tag.lstrip("#"))
+        )
+
+    async def warleague(self, sid: str) -> Dict:
+        """
+        Function to Retrieve information about a clan war league war.
+        """
+        return await self._api_response(uri=self.CLANWARLEAGUE_WAR_URI.format(sid=sid))
+
+    async def clan_war_log(self, tag: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Retrieve clan's clan war log
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.CLAN_WAR_LOG_URI.format(tag=tag.lstrip("#")), params=params
+        )
+
+    async def clan(self, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Search all clans by name and/or filtering the results using
+        various criteria.At least one filtering criteria must be defined and if
+        name is used as part of search, it is required to be at least three
+        characters long.It is not possible to specify ordering for results so
+        clients should not rely on any specific ordering as that may change
+        in the future releases of the API.
+        """
+        if not self._check_params(params=params, valid_items=self.CLAN_SEARCH_PARAMS):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(uri="/clans", params=params)
+
+    async def clan_current_war(self, tag: str) -> Dict:
+        """
+        Function to Retrieve information about clan's current clan war
+        """
+        return await self._api_response(
+            uri=self.CLAN_CURRENT_WAR_URI.format(tag=tag.lstrip("#"))
+        )
+
+    async def clan_tag(self, tag: str) -> Dict:
+        """
+        Function to Get information about a single clan by clan tag.
+        Clan tags can be found using clan search operation.
+        """
+        return await self._api_response(uri=self.CLAN_URI.format(tag=tag.lstrip("#")))
+
+    async def clans_bulk(self, tags: List[str]) -> List[Dict]:
+        """
+        Function to Get information about several clans at once,
+        the order of the results matches the order of the tags
+        """
+        return await self.__gather([self.clan_tag(tag) for tag in tags])
+
+    async def clan_members(self, tag: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to List clan members
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.CLAN_MEMBERS_URI.format(tag=tag.lstrip("#")), params=params
+        )
+
+    async def clan_members_bulk(self, tags: List[str]) -> List[Dict]:
+        """
+        Function to List the members of several clans at once,
+        the order of the results matches the order of the tags
+        """
+        return await self.__gather([self.clan_members(tag) for tag in tags])
+
+    async def clan_members_detailed(self, tag: str) -> Dict:
+        """
+        Function to List clan members along with the player profile of each
+        member. The player profiles are fetched concurrently.
+        """
+        members = await self.clan_members(tag)
+        if not members.get("items"):
+            return members
+        players = await self.players_bulk(
+            [member["tag"] for member in members["items"]]
+        )
+        return dict(members, items=players)
+
+    async def clan_capitalraidseasons(
+        self, tag: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Retrieve information about clan's current clan war
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.CLAN_CAPITALRAIDSEASONS_URI.format(tag=tag.lstrip("#")),
+            params=params,
+        )
+
+    async def players(self, tag: str) -> Dict:
+        """
+        Function to Get information about a single player by player tag.
+        Player tags can be found either in game or by from clan member lists.
+        """
+        return await self._api_response(uri=self.PLAYER_URI.format(tag=tag.lstrip("#")))
+
+    async def players_bulk(self, tags: List[str]) -> List[Dict]:
+        """
+        Function to Get information about several players at once,
+        the order of the results matches the order of the tags
+        """
+        return await self.__gather([self.players(tag) for tag in tags])
+
+    async def location_id_clan_rank(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get clan rankings for a specific location
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LOCATION_CLAN_RANK_URI.format(id=id), params=params
+        )
+
+    async def location_id_player_rank(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get player rankings for a specific location
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LOCATION_PLAYER_RANK_URI.format(id=id), params=params
+        )
+
+    async def location_clan_versus(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get clan versus rankings for a specific location
+        """
+        warn(
+            "This end will be deprecated in the future.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+
+        return await self._api_response(
+            uri=self.LOCATION_CLAN_VERSUS_URI.format(id=id), params=params
+        )
+
+    async def location_players_builder_base(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get player builder base rankings for a specific location
+        """
+
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+
+        return await self._api_response(
+            uri=self.LOCATION_PLAYERS_BUILDER_BASE_URI.format(id=id), params=params
+        )
+
+    async def location_clans_builder_base(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get clan builder base rankings for a specific location
+        """
+
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+
+        return await self._api_response(
+            uri=self.LOCATION_CLANS_BUILDER_BASE_URI.format(id=id), params=params
+        )
+
+    async def location_player_versus(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get player versus rankings for a specific location
+        """
+        warn(
+            "This end will be deprecated in the future.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LOCATION_PLAYER_VERSUS_URI.format(id=id), params=params
+        )
+
+    async def locations(self, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to List all available locations
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(uri="/locations", params=params)
+
+    async def location_rankings_capitals(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get capital rankings for a specific location
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LOCATION_CAPITALS_URI.format(id=id), params=params
+        )
+
+    async def location_id(self, id: str) -> Dict:
+        """
+        Function to Get information about specific location
+        """
+        return await self._api_response(uri=self.LOCATION_URI.format(id=id))
+
+    async def league(self, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Get list of leagues
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(uri="/leagues", params=params)
+
+    async def league_id(self, id: str) -> Dict:
+        """
+        Function to Get league information
+        """
+        return await self._api_response(uri=self.LEAGUE_URI.format(id=id))
+
+    async def league_season(self, id: str, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Get league seasons.
+        Note that league season information is available only for Legend League.
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LEAGUE_SEASONS_URI.format(id=id), params=params
+        )
+
+    async def league_season_id(
+        self, id: str, sid: str, params: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Function to Get league season rankings.
+        Note that league season information is available only for Legend League.
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(
+            uri=self.LEAGUE_SEASON_URI.format(id=id, sid=sid), params=params
+        )
+
+    async def warleagues(self) -> Dict:
+        """
+        Function to Get list of clan war leagues
+        """
+        return await self._api_response(
+            uri="/warleagues",
+        )
+
+    async def warleagues_id(self, league_id: str) -> Dict:
+        """
+        Function to Get information about a clan war league
+        """
+        return await self._api_response(
+            uri=self.WARLEAGUE_URI.format(league_id=league_id),
+        )
+
+    async def labels_clans(self, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Get labels for a clan
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(uri="/labels/clans", params=params)
+
+    async def labels_players(self, params: Optional[Dict] = None) -> Dict:
+        """
+        Function to Get labels for a player
+        """
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return await self._api_response(uri="/labels/players/", params=params)
+
+    async def goldpass_seasons_current(self) -> Dict:
+        """
+        Function to Get current gold pass season
+        """
+        return await self._api_response(uri="/goldpass/seasons/current")
+
+    async def player_verifytoken(self, token: str, player_tag: str) -> Dict:
+        """
+        Function to Verify player token
+        """
+
+        try:
+            response = await self.__get_client().post(
+                url=self.ENDPOINT
+                + self.PLAYER_VERIFYTOKEN_URI.format(tag=player_tag.lstrip("#")),
+                headers={
+                    "Authorization": f"Bearer {token}",
+                    "Accept": "application/json",
+                },
+                data={"token": token},
+            )
+            response_json = _parse_json(response)
+
+            if self.status_code:
+                response_json = dict(response_json, status_code=response.status_code)
+            return response_json
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": "Something broke",
+                "exception": str(e),
+            }
@@ -1,14 +1,390 @@
-import urllib
-from typing import Any, Dict, Tuple
+import hashlib
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
+from typing import (
+    Any,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+)
 from warnings import warn
 
 import httpx
 
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None  # type: ignore
 
-class CocApi:
-    def __init__(self, token: str, timeout: int = 20, status_code: bool = False):
-        """
-        Initialising requisites
+try:
+    import h2  # noqa: F401
+
+    _HTTP2_AVAILABLE = True
+except ImportError:  # installed with the http2 extra
+    _HTTP2_AVAILABLE = False
+
+
+def _parse_json(response: httpx.Response) -> Any:
+    """
+    Decode a response body, with orjson when it is installed
+    """
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _request_key(uri: str, params: Optional[Dict], status_code: bool) -> Tuple:
+    """
+    Key identifying a request, for the response cache and in-flight requests
+    """
+    return (
+        uri,
+        tuple(sorted((k, str(v)) for k, v in params.items())) if params else (),
+        status_code,
+    )
+
+
+# Monotonic time test() last passed for each token and endpoint, clients
+# created again with them shortly after skip the check. Tokens are stored as
+# digests so the bearer tokens themselves are not kept around.
+_HEALTH_CHECKS: Dict[Tuple[bytes, str], float] = {}
+
+
+def _health_check_key(token: str, endpoint: str) -> Tuple[bytes, str]:
+    return hashlib.sha256(token.encode()).digest(), endpoint
+
+
+def _health_check_due(token: str, endpoint: str, ttl: float) -> bool:
+    checked_at = _HEALTH_CHECKS.get(_health_check_key(token, endpoint))
+    return checked_at is None or time.monotonic() - checked_at >= ttl
+
+
+def _needs_health_check(token: str, endpoint: str, ttl: float, remember: bool) -> bool:
+    # A check passed against an injected transport or client says nothing
+    # about the real api, so it is neither reused nor remembered
+    return not remember or _health_check_due(token, endpoint, ttl)
+
+
+def _health_check_passed(token: str, endpoint: str, remember: bool) -> None:
+    if remember:
+        _HEALTH_CHECKS[_health_check_key(token, endpoint)] = time.monotonic()
+
+
+_TEST_MESSAGES: Mapping[int, str] = MappingProxyType(
+    {
+        200: "Api is up and running!",
+        403: "Invalid token",
+    }
+)
+
+
+def _test_response(status_code: int, with_status_code: bool) -> Dict[str, Any]:
+    """
+    Result of test() for the status code the api answered with
+    """
+    response_json: Dict[str, Any] = {
+        "result": "success" if status_code == 200 else "error",
+        "message": _TEST_MESSAGES.get(status_code, "Api is Down!"),
+    }
+    # Only an unexpected status is worth reporting
+    if with_status_code and status_code not in _TEST_MESSAGES:
+        response_json["status_code"] = status_code
+    return response_json
+
+
+def _error_response(message: str, exception: BaseException) -> Dict:
+    return {
+        "result": "error",
+        "message": message,
+        "exception": str(exception),
+    }
+
+
+def _request_error(exception: Exception) -> Dict:
+    """
+    Error returned for a request that failed or got an unreadable response
+    """
+    if isinstance(exception, httpx.TimeoutException):
+        return _error_response("Request timed out, please try again!", exception)
+    if isinstance(exception, httpx.HTTPError):
+        return _error_response("Something broke, please try again!", exception)
+    # json and orjson decode errors both derive from ValueError
+    return _error_response("Invalid response from the api", exception)
+
+
+def _should_retry(response: httpx.Response) -> bool:
+    return response.status_code == 429 or response.status_code >= 500
+
+
+def _backoff_delay(
+    attempt: int,
+    retry_delay: float,
+    max_retry_delay: float,
+    response: Optional[httpx.Response] = None,
+) -> float:
+    """
+    Seconds to wait before retrying, the Retry-After of the response when it
+    has one, else a random delay up to retry_delay doubled on every attempt
+    so clients that failed together do not retry together
+    """
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            pass
+        else:
+            return min(max_retry_delay, max(retry_after, 0.0))
+    return min(max_retry_delay, retry_delay * 2**attempt) * random.random()
+
+
+class _TTLCache:
+    """
+    Least recently used cache whose entries expire ttl seconds after being set.
+    Expiry times are kept in a heap so expired entries are dropped, oldest
+    first, before any live entry gets evicted. Hits, misses, sets and
+    evictions (expired or least recently used) are counted as they happen.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict]]" = OrderedDict()
+        # (expires_at, insertion order, key), entries that were replaced or
+        # evicted since are skipped when popped
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.sets = self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Dict]:
+        with self._lock:
+            self.__drop_expired()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+
+    def set(self, key: Hashable, value: Dict) -> None:
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            self._entries[key] = (expires_at, dict(value))
+            self._entries.move_to_end(key)
+            heapq.heappush(self._expiry_heap, (expires_at, next(self._counter), key))
+            self.sets += 1
+            self.__drop_expired()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if len(self._expiry_heap) > 2 * self.max_entries:
+                self.__rebuild_heap()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self.__drop_expired()
+            return {
+                "total_entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+            }
+
+    def __drop_expired(self) -> None:
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                del self._entries[key]
+                self.evictions += 1
+
+    def __rebuild_heap(self) -> None:
+        # Stale heap items of replaced or evicted entries pile up otherwise
+        self._expiry_heap = [
+            (expires_at, next(self._counter), key)
+            for key, (expires_at, _) in self._entries.items()
+        ]
+        heapq.heapify(self._expiry_heap)
+
+
+class _TokenBucket:
+    """
+    Token bucket refilled with rate tokens per second holding at most burst tokens
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        Take a token and return how many seconds to wait before using it,
+        or None without taking one when that would be longer than max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._last_refill) * self.rate
+            )
+            self._last_refill = now
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+def _rate_limited_response() -> httpx.Response:
+    """
+    Stand-in for the 429 the api would answer a request over the rate limit
+    """
+    return httpx.Response(
+        429,
+        json={
+            "result": "error",
+            "message": "Rate limit reached, request was not sent",
+        },
+    )
+
+
+def _handle_response(
+    response: httpx.Response,
+    status_code: bool,
+    cache: Optional[_TTLCache],
+    key: Hashable,
+) -> Dict:
+    """
+    Decode a response, adding its status code when asked to and caching it
+    when it is successful
+    """
+    response_json = _parse_json(response)
+    if not isinstance(response_json, dict):
+        raise ValueError("Expected a json object from the api")
+    if status_code:
+        response_json["status_code"] = response.status_code
+    if cache is not None and response.status_code == 200:
+        cache.set(key, response_json)
+    return response_json
+
+
+class _CocApiEndpoints:
+    """
+    Endpoint uris and params shared by CocApi and AsyncCocApi
+    """
+
+    DEFAULT_PARAMS: ClassVar[FrozenSet[str]] = frozenset({"limit", "after", "before"})
+    CLAN_SEARCH_PARAMS: ClassVar[FrozenSet[str]] = DEFAULT_PARAMS | {
+        "name",
+        "warFrequency",
+        "locationId",
+        "minMembers",
+        "maxMembers",
+        "minClanPoints",
+        "minClanLevel",
+        "labelIds",
+    }
+    ERROR_INVALID_PARAM: ClassVar[Mapping[str, str]] = MappingProxyType(
+        {
+            "result": "error",
+            "message": "Invalid params for method",
+        }
+    )
+
+    CLAN_URI: ClassVar[str] = "/clans/%23{tag}"
+    CLAN_CURRENT_WAR_URI: ClassVar[str] = "/clans/%23{tag}/currentwar"
+    CLAN_LEAGUEGROUP_URI: ClassVar[str] = "/clans/%23{tag}/currentwar/leaguegroup"
+    CLAN_CAPITALRAIDSEASONS_URI: ClassVar[str] = (
+        "/clans/%23{tag}/currentwar/capitalraidseasons"
+    )
+    CLAN_WAR_LOG_URI: ClassVar[str] = "/clans/%23{tag}/warlog"
+    CLAN_MEMBERS_URI: ClassVar[str] = "/clans/%23{tag}/members"
+    CLANWARLEAGUE_WAR_URI: ClassVar[str] = "/clanwarleagues/wars/{sid}"
+    PLAYER_URI: ClassVar[str] = "/players/%23{tag}"
+    PLAYER_VERIFYTOKEN_URI: ClassVar[str] = "/players/%23{tag}/verifytoken"
+    LOCATION_URI: ClassVar[str] = "/locations/{id}"
+    LOCATION_CLAN_RANK_URI: ClassVar[str] = "/locations/{id}/rankings/clans"
+    LOCATION_PLAYER_RANK_URI: ClassVar[str] = "/locations/{id}/rankings/players"
+    LOCATION_CLAN_VERSUS_URI: ClassVar[str] = "/locations/{id}/rankings/clans-versus"
+    LOCATION_PLAYER_VERSUS_URI: ClassVar[str] = (
+        "/locations/{id}/rankings/players-versus"
+    )
+    LOCATION_CLANS_BUILDER_BASE_URI: ClassVar[str] = (
+        "/locations/{id}/rankings/clans-builder-base"
+    )
+    LOCATION_PLAYERS_BUILDER_BASE_URI: ClassVar[str] = (
+        "/locations/{id}/rankings/players-builder-base"
+    )
+    LOCATION_CAPITALS_URI: ClassVar[str] = "/locations/{id}/rankings/capitals"
+    LEAGUE_URI: ClassVar[str] = "/leagues/{id}"
+    LEAGUE_SEASONS_URI: ClassVar[str] = "/leagues/{id}/seasons"
+    LEAGUE_SEASON_URI: ClassVar[str] = "/leagues/{id}/seasons/{sid}"
+    WARLEAGUE_URI: ClassVar[str] = "/warleagues/{league_id}"
+
+    def _check_params(
+        self, params: Optional[Dict], valid_items: FrozenSet[str] = frozenset()
+    ) -> bool:
+        """
+        Function to check that the endpoint supports every given param
+        """
+        if not params:
+            return True
+        valid_items = self.DEFAULT_PARAMS if not valid_items else valid_items
+        return params.keys() <= valid_items
+
+
+class CocApi(_CocApiEndpoints):
+    def __init__(
+        self,
+        token: str,
+        timeout: int = 20,
+        status_code: bool = False,
+        http2: Optional[bool] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        enable_caching: bool = False,
+        cache_ttl: int = 300,
+        cache_max_entries: int = 1024,
+        enable_rate_limiting: bool = False,
+        requests_per_second: float = 10.0,
+        burst_limit: int = 20,
+        max_rate_limit_wait: Optional[float] = None,
+        max_retries: int = 0,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+        health_check_ttl: float = 60.0,
+        transport: Optional[httpx.BaseTransport] = None,
+        client: Optional[httpx.Client] = None,
+        validate_token: bool = True,
+    ):
+        """
+        Initialising requisites, the connection pool, caching, rate limiting,
+        retry and token check options are described in the README
         """
         self.token = token
         self.ENDPOINT = "https://api.clashofclans.com/v1"
@@ -18,21 +394,79 @@ class CocApi:
             "Accept": "application/json",
         }
         self.status_code = status_code
-        self.DEFAULT_PARAMS = ("limit", "after", "before")
-        self.ERROR_INVALID_PARAM = {
-            "result": "error",
-            "message": "Invalid params for method",
-        }
-        test_reponse = self.test()
-        if test_reponse.get("result") == "error":
-            raise Exception(test_reponse.get("message"))
-
-    def __check_if_dict_invalid(self, params: Dict, valid_items: Tuple = ()) -> bool:
-        valid_items = self.DEFAULT_PARAMS if not valid_items else valid_items
-        return set(params.keys()).issubset(valid_items)
-
-    def __api_response(
-        self, uri: str, params: Dict = {}, status_code: bool = False
+        self.http2 = _HTTP2_AVAILABLE if http2 is None else http2
+        self.max_connections = max_connections
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.__owns_client = client is None
+        if client is None:
+            client = httpx.Client(
+                base_url=self.ENDPOINT,
+                headers=self.headers,
+                timeout=timeout,
+                http2=self.http2,
+                limits=self.limits,
+                transport=transport,
+            )
+        self._client = client
+        self.enable_caching = enable_caching
+        self.__cache = _TTLCache(ttl=cache_ttl, max_entries=cache_max_entries)
+        self.enable_rate_limiting = enable_rate_limiting
+        self.__rate_limiter = _TokenBucket(rate=requests_per_second, burst=burst_limit)
+        self.max_rate_limit_wait = max_rate_limit_wait
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.__inflight: Dict[Tuple, Future] = {}
+        self.__inflight_lock = threading.Lock()
+        remember = transport is None and self.__owns_client
+        if validate_token and _needs_health_check(
+            token, self.ENDPOINT, health_check_ttl, remember
+        ):
+            try:
+                test_reponse = self.test()
+                if test_reponse.get("result") == "error":
+                    raise Exception(test_reponse.get("message"))
+            except BaseException:
+                # test() raises when the api cannot be reached at all
+                self.close()
+                raise
+            _health_check_passed(token, self.ENDPOINT, remember)
+
+    def __enter__(self) -> "CocApi":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Any,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Function to close the connection pool used by the client
+        """
+        if self.__owns_client:
+            self._client.close()
+
+    def clear_cache(self) -> None:
+        """
+        Function to drop every cached response
+        """
+        self.__cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Function to Get the state of the response cache
+        """
+        return dict(self.__cache.stats(), cache_enabled=self.enable_caching)
+
+    def _api_response(
+        self, uri: str, params: Optional[Dict] = None, status_code: bool = False
     ) -> Dict:
         """
         Function to handle requests,it is possible to use this handler on it's
@@ -44,67 +478,119 @@ class CocApi:
         Return:
             The json response from the api as is or returns error if broken
         """
-        url = f"{self.ENDPOINT}{uri}?{urllib.parse.urlencode(params)}"  # type: ignore
+        key = _request_key(uri=uri, params=params, status_code=status_code)
+        if self.enable_caching:
+            cached = self.__cache.get(key)
+            if cached is not None:
+                return cached
+        # Identical requests issued concurrently (from several threads) share
+        # the response of the one that is already in flight
+        with self.__inflight_lock:
+            inflight = self.__inflight.get(key)
+            if inflight is None:
+                future: Future = Future()
+                self.__inflight[key] = future
+        if inflight is not None:
+            return dict(inflight.result())
         try:
-            response = httpx.get(url=url, headers=self.headers, timeout=self.timeout)
-            response_json = response.json()
-            if status_code or self.status_code:
-                response_json = dict(
-                    response_json.update({"status_code": response.status_code})
+            response_json = self.__request(
+                uri=uri, params=params, status_code=status_code, key=key
+            )
+        except BaseException as e:
+            # Waiting threads would otherwise block forever
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response_json)
+            return response_json
+        finally:
+            with self.__inflight_lock:
+                del self.__inflight[key]
+
+    # Name the handler had before it was made overridable, kept for direct
+    # calls only: the endpoint methods call _api_response, so patching this
+    # old name no longer intercepts them
+    __api_response = _api_response
+
+    def __send(self, uri: str, params: Optional[Dict]) -> httpx.Response:
+        """
+        Send the request, retrying timeouts, connection errors, 429 and 5xx
+        responses with exponential backoff
+        """
+        attempt = 0
+        while True:
+            response = None
+            if self.enable_rate_limiting:
+                delay = self.__rate_limiter.reserve(self.max_rate_limit_wait)
+                if delay is None:
+                    return _rate_limited_response()
+                if delay:
+                    time.sleep(delay)
+            try:
+                # Absolute url and headers so that a client passed in works too
+                response = self._client.get(
+                    self.ENDPOINT + uri, params=params, headers=self.headers
                 )
-            return dict(response_json)
-        except Exception as e:
-            return {
-                "result": "error",
-                "message": "Something broke, please try again!",
-                "exception": str(e),
-            }
+            except (httpx.TimeoutException, httpx.ConnectError):
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if not _should_retry(response) or attempt >= self.max_retries:
+                    return response
+            time.sleep(
+                _backoff_delay(
+                    attempt, self.retry_delay, self.max_retry_delay, response
+                )
+            )
+            attempt += 1
+
+    def __request(
+        self, uri: str, params: Optional[Dict], status_code: bool, key: Hashable
+    ) -> Dict:
+        try:
+            response = self.__send(uri=uri, params=params)
+            return _handle_response(
+                response,
+                status_code=status_code or self.status_code,
+                cache=self.__cache if self.enable_caching else None,
+                key=key,
+            )
+        except (httpx.HTTPError, ValueError) as e:
+            return _request_error(e)
 
     def test(self) -> Dict[str, Any]:
         """
         Function to test if the api is up and running.
             Dictionary with a success if api is up error if false
         """
-        response = httpx.get(url=self.ENDPOINT, headers=self.headers)
-        if response.status_code == 200:
-            return {"result": "success", "message": "Api is up and running!"}
-        elif response.status_code == 403:
-            return {
-                "result": "error",
-                "message": "Invalid token",
-            }
-        else:
-            response_json = {
-                "result": "error",
-                "message": "Api is Down!",
-            }
-            if self.status_code:
-                response_json.update(
-                    {"status_code": response.status_code}
-                )  # type: ignore
-            return response_json
+        response = self._client.get(self.ENDPOINT, headers=self.headers)
+        return _test_response(response.status_code, self.status_code)
 
     def clan_leaguegroup(self, tag: str) -> Dict:
         """
         Function to Retrieve information about clan's current clan war league group
         """
-        return self.__api_response(uri=f"/clans/%23{tag[1:]}/currentwar/leaguegroup")
+        return self._api_response(
+            uri=self.CLAN_LEAGUEGROUP_URI.format(tag=tag.lstrip("#"))
+        )
 
     def warleague(self, sid: str) -> Dict:
         """
         Function to Retrieve information about a clan war league war.
         """
-        return self.__api_response(uri=f"/clanwarleagues/wars/{str(sid)}")
+        return self._api_response(uri=self.CLANWARLEAGUE_WAR_URI.format(sid=sid))
 
-    def clan_war_log(self, tag: str, params: Dict = {}) -> Dict:
+    def clan_war_log(self, tag: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Retrieve clan's clan war log
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri=f"/clans/%23{tag[1:]}/warlog", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.CLAN_WAR_LOG_URI.format(tag=tag.lstrip("#")), params=params
+        )
 
-    def clan(self, params: Dict = {}) -> Dict:
+    def clan(self, params: Optional[Dict] = None) -> Dict:
         """
         Function to Search all clans by name and/or filtering the results using
         various criteria.At least one filtering criteria must be defined and if
@@ -113,52 +599,61 @@ class CocApi:
         clients should not rely on any specific ordering as that may change
         in the future releases of the API.
         """
-        valid_items = tuple(
-            [
-                "name",
-                "warFrequency",
-                "locationId",
-                "minMembers",
-                "maxMembers",
-                "minClanPoints",
-                "minClanLevel",
-                "labelIds",
-            ]
-            + list(self.DEFAULT_PARAMS)
-        )
-        if not self.__check_if_dict_invalid(params=params, valid_items=valid_items):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri="/clans", params=params)
+        if not self._check_params(params=params, valid_items=self.CLAN_SEARCH_PARAMS):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(uri="/clans", params=params)
 
     def clan_current_war(self, tag: str) -> Dict:
         """
         Function to Retrieve information about clan's current clan war
         """
-        return self.__api_response(uri=f"/clans/%23{tag[1:]}/currentwar")
+        return self._api_response(
+            uri=self.CLAN_CURRENT_WAR_URI.format(tag=tag.lstrip("#"))
+        )
 
     def clan_tag(self, tag: str) -> Dict:
         """
         Function to Get information about a single clan by clan tag.
         Clan tags can be found using clan search operation.
         """
-        return self.__api_response(uri=f"/clans/%23{tag[1:]}")
+        return self._api_response(uri=self.CLAN_URI.format(tag=tag.lstrip("#")))
 
-    def clan_members(self, tag: str, params: Dict = {}) -> Dict:
+    def clan_members(self, tag: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to List clan members
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri=f"/clans/%23{tag[1:]}/members", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.CLAN_MEMBERS_URI.format(tag=tag.lstrip("#")), params=params
+        )
 
-    def clan_capitalraidseasons(self, tag: str, params: Dict = {}) -> Dict:
+    def clan_members_detailed(self, tag: str) -> Dict:
+        """
+        Function to List clan members along with the player profile of each
+        member, the player profiles are fetched concurrently
+        """
+        members = self.clan_members(tag)
+        if not members.get("items"):
+            return members
+        tags = [member["tag"] for member in members["items"]]
+        # Each lookup goes through the client like any other call, sharing its
+        # connection pool, cache, rate limiting and retries
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_connections, len(tags))
+        ) as executor:
+            players = list(executor.map(self.players, tags))
+        return dict(members, items=players)
+
+    def clan_capitalraidseasons(self, tag: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Retrieve information about clan's current clan war
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/clans/%23{tag[1:]}/currentwar/capitalraidseasons", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.CLAN_CAPITALRAIDSEASONS_URI.format(tag=tag.lstrip("#")),
+            params=params,
         )
 
     def players(self, tag: str) -> Dict:
@@ -166,29 +661,29 @@ class CocApi:
         Function to Get information about a single player by player tag.
         Player tags can be found either in game or by from clan member lists.
         """
-        return self.__api_response(uri=f"/players/%23{tag[1:]}")
+        return self._api_response(uri=self.PLAYER_URI.format(tag=tag.lstrip("#")))
 
-    def location_id_clan_rank(self, id: str, params: Dict = {}) -> Dict:
+    def location_id_clan_rank(self, id: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get clan rankings for a specific location
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/clans", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LOCATION_CLAN_RANK_URI.format(id=id), params=params
         )
 
-    def location_id_player_rank(self, id: str, params: Dict = {}) -> Dict:
+    def location_id_player_rank(self, id: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get player rankings for a specific location
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/players", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LOCATION_PLAYER_RANK_URI.format(id=id), params=params
         )
 
-    def location_clan_versus(self, id: str, params: Dict = {}) -> Dict:
+    def location_clan_versus(self, id: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get clan versus rankings for a specific location
         """
@@ -197,38 +692,42 @@ class CocApi:
             DeprecationWarning,
             stacklevel=2,
         )
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
 
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/clans-versus", params=params
+        return self._api_response(
+            uri=self.LOCATION_CLAN_VERSUS_URI.format(id=id), params=params
         )
 
-    def location_players_builder_base(self, id: str, params: Dict = {}) -> Dict:
+    def location_players_builder_base(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
         """
         Function to Get player builder base rankings for a specific location
         """
 
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
 
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/players-builder-base", params=params
+        return self._api_response(
+            uri=self.LOCATION_PLAYERS_BUILDER_BASE_URI.format(id=id), params=params
         )
 
-    def location_clans_builder_base(self, id: str, params: Dict = {}) -> Dict:
+    def location_clans_builder_base(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
         """
         Function to Get clan builder base rankings for a specific location
         """
 
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
 
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/clans-builder-base", params=params
+        return self._api_response(
+            uri=self.LOCATION_CLANS_BUILDER_BASE_URI.format(id=id), params=params
         )
 
-    def location_player_versus(self, id: str, params: Dict = {}) -> Dict:
+    def location_player_versus(self, id: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get player versus rankings for a specific location
         """
@@ -237,13 +736,13 @@ class CocApi:
             DeprecationWarning,
             stacklevel=2,
         )
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/players-versus", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LOCATION_PLAYER_VERSUS_URI.format(id=id), params=params
         )
 
-    def location(self, params: Dict = {}) -> Dict:
+    def location(self, params: Optional[Dict] = None) -> Dict:
         """
         Function List all available locations
         Will be depricated in the future in favour of locations
@@ -258,69 +757,75 @@ class CocApi:
         )
         return self.locations(params=params)
 
-    def locations(self, params: Dict = {}) -> Dict:
+    def locations(self, params: Optional[Dict] = None) -> Dict:
         """
         Function to List all available locations
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri="/locations", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(uri="/locations", params=params)
 
-    def location_rankings_capitals(self, id: str, params: Dict = {}) -> Dict:
+    def location_rankings_capitals(
+        self, id: str, params: Optional[Dict] = None
+    ) -> Dict:
         """
         Function to Get capital rankings for a specific location
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/locations/{str(id)}/rankings/capitals", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LOCATION_CAPITALS_URI.format(id=id), params=params
         )
 
     def location_id(self, id: str) -> Dict:
         """
         Function to Get information about specific location
         """
-        return self.__api_response(uri=f"/locations/{str(id)}")
+        return self._api_response(uri=self.LOCATION_URI.format(id=id))
 
-    def league(self, params: Dict = {}) -> Dict:
+    def league(self, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get list of leagues
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri="/leagues", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(uri="/leagues", params=params)
 
     def league_id(self, id: str) -> Dict:
         """
         Function to Get league information
         """
-        return self.__api_response(uri=f"/leagues/{str(id)}")
+        return self._api_response(uri=self.LEAGUE_URI.format(id=id))
 
-    def league_season(self, id: str, params: Dict = {}) -> Dict:
+    def league_season(self, id: str, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get league seasons.
         Note that league season information is available only for Legend League.
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri=f"/leagues/{str(id)}/seasons", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LEAGUE_SEASONS_URI.format(id=id), params=params
+        )
 
-    def league_season_id(self, id: str, sid: str, params: Dict = {}) -> Dict:
+    def league_season_id(
+        self, id: str, sid: str, params: Optional[Dict] = None
+    ) -> Dict:
         """
         Function to Get league season rankings.
         Note that league season information is available only for Legend League.
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(
-            uri=f"/leagues/{str(id)}/seasons/{str(sid)}", params=params
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(
+            uri=self.LEAGUE_SEASON_URI.format(id=id, sid=sid), params=params
         )
 
     def warleagues(self) -> Dict:
         """
         Function to Get list of clan war leagues
         """
-        return self.__api_response(
+        return self._api_response(
             uri="/warleagues",
         )
 
@@ -328,31 +833,31 @@ class CocApi:
         """
         Function to Get information about a clan war league
         """
-        return self.__api_response(
-            uri=f"/warleagues/{str(league_id)}",
+        return self._api_response(
+            uri=self.WARLEAGUE_URI.format(league_id=league_id),
         )
 
-    def labels_clans(self, params: Dict = {}) -> Dict:
+    def labels_clans(self, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get labels for a clan
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri="/labels/clans", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(uri="/labels/clans", params=params)
 
-    def labels_players(self, params: Dict = {}) -> Dict:
+    def labels_players(self, params: Optional[Dict] = None) -> Dict:
         """
         Function to Get labels for a player
         """
-        if not self.__check_if_dict_invalid(params=params):
-            return self.ERROR_INVALID_PARAM
-        return self.__api_response(uri="/labels/players/", params=params)
+        if not self._check_params(params=params):
+            return dict(self.ERROR_INVALID_PARAM)
+        return self._api_response(uri="/labels/players/", params=params)
 
     def goldpass_seasons_current(self) -> Dict:
         """
         Function to Get current gold pass season
         """
-        return self.__api_response(uri="/goldpass/seasons/current")
+        return self._api_response(uri="/goldpass/seasons/current")
 
     def player_verifytoken(self, token: str, player_tag: str) -> Dict:
         """
@@ -360,15 +865,16 @@ class CocApi:
         """
 
         try:
-            response = httpx.post(
-                url=f"{self.ENDPOINT}/players/%23{player_tag[1:]}/verifytoken",
+            response = self._client.post(
+                url=self.ENDPOINT
+                + self.PLAYER_VERIFYTOKEN_URI.format(tag=player_tag.lstrip("#")),
                 headers={
                     "Authorization": f"Bearer {token}",
                     "Accept": "application/json",
                 },
                 data={"token": token},
             )
-            response_json = dict(response.json())
+            response_json = _parse_json(response)
 
             if self.status_code:
                 response_json = dict(response_json, status_code=response.status_code)
@@ -21,5 +21,10 @@ setuptools.setup(
         "License :: OSI Approved :: GNU General Public License (GPL)",
         "Operating System :: OS Independent",
     ),
-    extras_require={"dev": ["black", "pylint", "mypy", "isort"]},
+    extras_require={
+        "dev": ["black", "pylint", "mypy", "isort"],
+        "brotli": ["httpx[brotli]"],
+        "http2": ["httpx[http2]"],
+        "orjson": ["orjson"],
+    },
 )